@@ -41,10 +41,13 @@ if $JSON_MODE; then
     docs=()
     [[ -f "$RESEARCH" ]] && docs+=("research.md")
     [[ -f "$DATA_MODEL" ]] && docs+=("data-model.md")
-    ([[ -d "$CONTRACTS_DIR" ]] && [[ -n "$(ls -A "$CONTRACTS_DIR" 2>/dev/null)" ]]) && docs+=("contracts/")
+    [[ -d "$CONTRACTS_DIR" ]] && dir_has_entries "$CONTRACTS_DIR" && docs+=("contracts/")
     [[ -f "$QUICKSTART" ]] && docs+=("quickstart.md")
     # join array into JSON
-    json_docs=$(printf '"%s",' "${docs[@]}")
+    json_docs=""
+    for doc in "${docs[@]}"; do
+        json_docs+="\"$doc\","
+    done
     json_docs="[${json_docs%,}]"
     printf '{"FEATURE_DIR":"%s","AVAILABLE_DOCS":%s}\n' "$FEATURE_DIR" "$json_docs"
 else
@@ -52,11 +55,11 @@ else
     echo "FEATURE_DIR:$FEATURE_DIR"
     echo "AVAILABLE_DOCS:"
 
-    # Use common check functions
-    check_file "$RESEARCH" "research.md"
-    check_file "$DATA_MODEL" "data-model.md"
-    check_dir "$CONTRACTS_DIR" "contracts/"
-    check_file "$QUICKSTART" "quickstart.md"
+    # Use common check functions; a missing optional doc must not trip set -e
+    check_file "$RESEARCH" "research.md" || true
+    check_file "$DATA_MODEL" "data-model.md" || true
+    check_dir "$CONTRACTS_DIR" "contracts/" || true
+    check_file "$QUICKSTART" "quickstart.md" || true
 fi
 
 # Always succeed - task generation should work with whatever docs are available
\ No newline at end of file
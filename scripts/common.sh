@@ -1,21 +1,40 @@
 #!/usr/bin/env bash
 # Common functions and variables for all scripts
 
+# Get SPEC_KIT_ROOT as an absolute path without a trailing slash
+# Returns 1 if it is unset or not a directory
+get_spec_kit_root() {
+    [[ -n "$SPEC_KIT_ROOT" && -d "$SPEC_KIT_ROOT" ]] || return 1
+    (CDPATH= cd -- "$SPEC_KIT_ROOT" && pwd)
+}
+
 # Get repository root
+# Honors SPEC_KIT_ROOT so repeated invocations can skip the git lookup; scripts
+# that run git must target it with git -C so they act on the same repository
 get_repo_root() {
-    git rev-parse --show-toplevel
+    get_spec_kit_root || git rev-parse --show-toplevel
 }
 
+# get_current_branch and get_feature_dir are not used by the bundled scripts;
+# they are kept for custom scripts that source this file
+
 # Get current branch
 get_current_branch() {
     git rev-parse --abbrev-ref HEAD
 }
 
+# Get feature directory path
+get_feature_dir() {
+    local repo_root="$1"
+    local branch="$2"
+    echo "$repo_root/specs/$branch"
+}
+
 # Check if current branch is a feature branch
 # Returns 0 if valid, 1 if not
 check_feature_branch() {
     local branch="$1"
-    if [[ ! "$branch" =~ ^[0-9]{3}- ]]; then
+    if [[ "$branch" != [0-9][0-9][0-9]-* ]]; then
         echo "ERROR: Not on a feature branch. Current branch: $branch"
         echo "Feature branches should be named like: 001-feature-name"
         return 1
@@ -23,31 +42,31 @@ check_feature_branch() {
     return 0
 }
 
-# Get feature directory path
-get_feature_dir() {
-    local repo_root="$1"
-    local branch="$2"
-    echo "$repo_root/specs/$branch"
-}
-
 # Get all standard paths for a feature
 # Usage: eval $(get_feature_paths)
 # Sets: REPO_ROOT, CURRENT_BRANCH, FEATURE_DIR, FEATURE_SPEC, IMPL_PLAN, TASKS
 get_feature_paths() {
-    local repo_root=$(get_repo_root)
-    local current_branch=$(get_current_branch)
-    local feature_dir=$(get_feature_dir "$repo_root" "$current_branch")
+    local repo_root current_branch
+    if repo_root=$(get_spec_kit_root); then
+        current_branch=$(git -C "$repo_root" rev-parse --abbrev-ref HEAD)
+    else
+        # Resolve root and branch with a single git invocation
+        { read -r repo_root; read -r current_branch; } < <(git rev-parse --show-toplevel --abbrev-ref HEAD)
+    fi
+    # Same layout as get_feature_dir
+    local feature_dir="$repo_root/specs/$current_branch"
     
-    echo "REPO_ROOT='$repo_root'"
-    echo "CURRENT_BRANCH='$current_branch'"
-    echo "FEATURE_DIR='$feature_dir'"
-    echo "FEATURE_SPEC='$feature_dir/spec.md'"
-    echo "IMPL_PLAN='$feature_dir/plan.md'"
-    echo "TASKS='$feature_dir/tasks.md'"
-    echo "RESEARCH='$feature_dir/research.md'"
-    echo "DATA_MODEL='$feature_dir/data-model.md'"
-    echo "QUICKSTART='$feature_dir/quickstart.md'"
-    echo "CONTRACTS_DIR='$feature_dir/contracts'"
+    printf '%s\n' \
+        "REPO_ROOT='$repo_root'" \
+        "CURRENT_BRANCH='$current_branch'" \
+        "FEATURE_DIR='$feature_dir'" \
+        "FEATURE_SPEC='$feature_dir/spec.md'" \
+        "IMPL_PLAN='$feature_dir/plan.md'" \
+        "TASKS='$feature_dir/tasks.md'" \
+        "RESEARCH='$feature_dir/research.md'" \
+        "DATA_MODEL='$feature_dir/data-model.md'" \
+        "QUICKSTART='$feature_dir/quickstart.md'" \
+        "CONTRACTS_DIR='$feature_dir/contracts'"
 }
 
 # Check if a file exists and report
@@ -63,11 +82,22 @@ check_file() {
     fi
 }
 
+# Check if a directory has any entries, including hidden ones
+dir_has_entries() {
+    local entry
+    for entry in "$1"/* "$1"/.[!.]* "$1"/..?*; do
+        if [[ -e "$entry" || -L "$entry" ]]; then
+            return 0
+        fi
+    done
+    return 1
+}
+
 # Check if a directory exists and has files
 check_dir() {
     local dir="$1"
     local description="$2"
-    if [[ -d "$dir" ]] && [[ -n "$(ls -A "$dir" 2>/dev/null)" ]]; then
+    if [[ -d "$dir" ]] && dir_has_entries "$dir"; then
         echo "  ✓ $description"
         return 0
     else
@@ -6,6 +6,7 @@
 set -e
 
 JSON_MODE=false
+USAGE="Usage: $0 [--json] <feature_description>"
 
 # Collect non-flag args
 ARGS=()
@@ -15,62 +16,81 @@ for arg in "$@"; do
             JSON_MODE=true
             ;;
         --help|-h)
-            echo "Usage: $0 [--json] <feature_description>"; exit 0 ;;
+            echo "$USAGE"; exit 0 ;;
         *)
             ARGS+=("$arg") ;;
     esac
 done
 
 FEATURE_DESCRIPTION="${ARGS[*]}"
+# Trim surrounding whitespace so a blank description fails before any git work
+FEATURE_DESCRIPTION="${FEATURE_DESCRIPTION#"${FEATURE_DESCRIPTION%%[![:space:]]*}"}"
+FEATURE_DESCRIPTION="${FEATURE_DESCRIPTION%"${FEATURE_DESCRIPTION##*[![:space:]]}"}"
 if [ -z "$FEATURE_DESCRIPTION" ]; then
-        echo "Usage: $0 [--json] <feature_description>" >&2
+        echo "$USAGE" >&2
         exit 1
 fi
 
+# Source common functions
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$SCRIPT_DIR/common.sh"
+
 # Get repository root
-REPO_ROOT=$(git rev-parse --show-toplevel)
+REPO_ROOT=$(get_repo_root)
 SPECS_DIR="$REPO_ROOT/specs"
 
-# Create specs directory if it doesn't exist
-mkdir -p "$SPECS_DIR"
-
 # Find the highest numbered feature directory
+# The trailing slash makes the glob match directories only, and the prefix is
+# parsed with shell builtins so no processes are spawned per entry.
+# A missing specs directory leaves the glob unexpanded, which never matches.
 HIGHEST=0
-if [ -d "$SPECS_DIR" ]; then
-    for dir in "$SPECS_DIR"/*; do
-        if [ -d "$dir" ]; then
-            dirname=$(basename "$dir")
-            number=$(echo "$dirname" | grep -o '^[0-9]\+' || echo "0")
-            number=$((10#$number))
-            if [ "$number" -gt "$HIGHEST" ]; then
-                HIGHEST=$number
-            fi
+for dir in "$SPECS_DIR"/*/; do
+    dirname="${dir%/}"
+    dirname="${dirname##*/}"
+    if [[ "$dirname" =~ ^[0-9]+ ]]; then
+        number=$((10#${BASH_REMATCH[0]}))
+        if [ "$number" -gt "$HIGHEST" ]; then
+            HIGHEST=$number
         fi
-    done
-fi
+    fi
+done
 
 # Generate next feature number with zero padding
 NEXT=$((HIGHEST + 1))
 FEATURE_NUM=$(printf "%03d" "$NEXT")
 
 # Create branch name from description
-BRANCH_NAME=$(echo "$FEATURE_DESCRIPTION" | \
-    tr '[:upper:]' '[:lower:]' | \
-    sed 's/[^a-z0-9]/-/g' | \
-    sed 's/-\+/-/g' | \
-    sed 's/^-//' | \
-    sed 's/-$//')
+# Only the lowercasing needs an external command, and only when there is
+# something to lowercase; replacing non-alphanumerics and splitting into words
+# is done with shell builtins
+BRANCH_NAME="$FEATURE_DESCRIPTION"
+if [[ "$BRANCH_NAME" == *[[:upper:]]* ]]; then
+    BRANCH_NAME=$(printf '%s' "$BRANCH_NAME" | tr '[:upper:]' '[:lower:]')
+fi
+BRANCH_NAME="${BRANCH_NAME//[^a-z0-9]/-}"
 
 # Extract 2-3 meaningful words
-WORDS=$(echo "$BRANCH_NAME" | tr '-' '\n' | grep -v '^$' | head -3 | tr '\n' '-' | sed 's/-$//')
+IFS='-' read -ra PARTS <<< "$BRANCH_NAME"
+WORDS=""
+WORD_COUNT=0
+for part in "${PARTS[@]}"; do
+    if [ -z "$part" ]; then
+        continue
+    fi
+    WORDS="${WORDS:+$WORDS-}$part"
+    WORD_COUNT=$((WORD_COUNT + 1))
+    if [ "$WORD_COUNT" -eq 3 ]; then
+        break
+    fi
+done
 
 # Final branch name
 BRANCH_NAME="${FEATURE_NUM}-${WORDS}"
 
-# Create and switch to new branch
-git checkout -b "$BRANCH_NAME"
+# Create and switch to new branch in the repository the specs belong to
+git -C "$REPO_ROOT" checkout -b "$BRANCH_NAME"
 
-# Create feature directory
+# Create feature directory (and the specs directory if it doesn't exist)
 FEATURE_DIR="$SPECS_DIR/$BRANCH_NAME"
 mkdir -p "$FEATURE_DIR"
 
@@ -82,7 +102,8 @@ if [ -f "$TEMPLATE" ]; then
     cp "$TEMPLATE" "$SPEC_FILE"
 else
     echo "Warning: Template not found at $TEMPLATE" >&2
-    touch "$SPEC_FILE"
+    # Create an empty spec
+    : >> "$SPEC_FILE"
 fi
 
 if $JSON_MODE; then
@@ -90,7 +111,6 @@ if $JSON_MODE; then
         "$BRANCH_NAME" "$SPEC_FILE" "$FEATURE_NUM"
 else
     # Output results for the LLM to use (legacy key: value format)
-    echo "BRANCH_NAME: $BRANCH_NAME"
-    echo "SPEC_FILE: $SPEC_FILE"
-    echo "FEATURE_NUM: $FEATURE_NUM"
+    printf 'BRANCH_NAME: %s\nSPEC_FILE: %s\nFEATURE_NUM: %s\n' \
+        "$BRANCH_NAME" "$SPEC_FILE" "$FEATURE_NUM"
 fi
\ No newline at end of file
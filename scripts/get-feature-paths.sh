@@ -1,9 +1,17 @@
 #!/usr/bin/env bash
 # Get paths for current feature branch without creating anything
 # Used by commands that need to find existing feature files
+# Usage: ./get-feature-paths.sh
 
 set -e
 
+# Answer --help before sourcing anything or asking git for the branch
+for arg in "$@"; do
+    case "$arg" in
+        --help|-h) echo "Usage: $0"; exit 0 ;;
+    esac
+done
+
 # Source common functions
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 source "$SCRIPT_DIR/common.sh"
@@ -15,9 +23,10 @@ eval $(get_feature_paths)
 check_feature_branch "$CURRENT_BRANCH" || exit 1
 
 # Output paths (don't create anything)
-echo "REPO_ROOT: $REPO_ROOT"
-echo "BRANCH: $CURRENT_BRANCH"
-echo "FEATURE_DIR: $FEATURE_DIR"
-echo "FEATURE_SPEC: $FEATURE_SPEC"
-echo "IMPL_PLAN: $IMPL_PLAN"
-echo "TASKS: $TASKS"
\ No newline at end of file
+printf '%s\n' \
+    "REPO_ROOT: $REPO_ROOT" \
+    "BRANCH: $CURRENT_BRANCH" \
+    "FEATURE_DIR: $FEATURE_DIR" \
+    "FEATURE_SPEC: $FEATURE_SPEC" \
+    "IMPL_PLAN: $IMPL_PLAN" \
+    "TASKS: $TASKS"
\ No newline at end of file
@@ -37,8 +37,6 @@ if $JSON_MODE; then
         "$FEATURE_SPEC" "$IMPL_PLAN" "$FEATURE_DIR" "$CURRENT_BRANCH"
 else
     # Output all paths for LLM use
-    echo "FEATURE_SPEC: $FEATURE_SPEC"
-    echo "IMPL_PLAN: $IMPL_PLAN"
-    echo "SPECS_DIR: $FEATURE_DIR"
-    echo "BRANCH: $CURRENT_BRANCH"
+    printf 'FEATURE_SPEC: %s\nIMPL_PLAN: %s\nSPECS_DIR: %s\nBRANCH: %s\n' \
+        "$FEATURE_SPEC" "$IMPL_PLAN" "$FEATURE_DIR" "$CURRENT_BRANCH"
 fi
\ No newline at end of file
@@ -2,22 +2,50 @@
 # Incrementally update agent context files based on new feature plan
 # Supports: CLAUDE.md, GEMINI.md, and .github/copilot-instructions.md
 # O(1) operation - only reads current context file and new plan.md
+# Usage: ./update-agent-context.sh [claude|gemini|copilot]
 
 set -e
 
-REPO_ROOT=$(git rev-parse --show-toplevel)
-CURRENT_BRANCH=$(git rev-parse --abbrev-ref HEAD)
-FEATURE_DIR="$REPO_ROOT/specs/$CURRENT_BRANCH"
-NEW_PLAN="$FEATURE_DIR/plan.md"
+USAGE="Usage: $0 [claude|gemini|copilot]
+  - No argument: Update all existing agent context files
+  - claude: Update only CLAUDE.md
+  - gemini: Update only GEMINI.md
+  - copilot: Update only .github/copilot-instructions.md"
+
+# Allow override via argument
+AGENT_TYPE=""
+for arg in "$@"; do
+    case "$arg" in
+        --help|-h)
+            printf '%s\n' "$USAGE"; exit 0 ;;
+        claude|gemini|copilot)
+            # Only one agent can be named; don't let a later one silently win
+            if [ -n "$AGENT_TYPE" ]; then
+                echo "ERROR: Only one agent type may be given (got '$AGENT_TYPE' and '$arg')."
+                printf '%s\n' "$USAGE"
+                exit 1
+            fi
+            AGENT_TYPE="$arg" ;;
+        *)
+            # Reject bad input before any git or plan.md work
+            echo "ERROR: Unknown agent type '$arg'. Use: claude, gemini, copilot, or leave empty for all."
+            exit 1 ;;
+    esac
+done
+
+# Source common functions
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$SCRIPT_DIR/common.sh"
+
+# Get all paths
+eval $(get_feature_paths)
+NEW_PLAN="$IMPL_PLAN"
 
 # Determine which agent context files to update
 CLAUDE_FILE="$REPO_ROOT/CLAUDE.md"
 GEMINI_FILE="$REPO_ROOT/GEMINI.md"
 COPILOT_FILE="$REPO_ROOT/.github/copilot-instructions.md"
 
-# Allow override via argument
-AGENT_TYPE="$1"
-
 if [ ! -f "$NEW_PLAN" ]; then
     echo "ERROR: No plan.md found at $NEW_PLAN"
     exit 1
@@ -25,12 +53,62 @@ fi
 
 echo "=== Updating agent context files for feature $CURRENT_BRANCH ==="
 
-# Extract tech from new plan
-NEW_LANG=$(grep "^**Language/Version**: " "$NEW_PLAN" 2>/dev/null | head -1 | sed 's/^**Language\/Version**: //' | grep -v "NEEDS CLARIFICATION" || echo "")
-NEW_FRAMEWORK=$(grep "^**Primary Dependencies**: " "$NEW_PLAN" 2>/dev/null | head -1 | sed 's/^**Primary Dependencies**: //' | grep -v "NEEDS CLARIFICATION" || echo "")
-NEW_TESTING=$(grep "^**Testing**: " "$NEW_PLAN" 2>/dev/null | head -1 | sed 's/^**Testing**: //' | grep -v "NEEDS CLARIFICATION" || echo "")
-NEW_DB=$(grep "^**Storage**: " "$NEW_PLAN" 2>/dev/null | head -1 | sed 's/^**Storage**: //' | grep -v "N/A" | grep -v "NEEDS CLARIFICATION" || echo "")
-NEW_PROJECT_TYPE=$(grep "^**Project Type**: " "$NEW_PLAN" 2>/dev/null | head -1 | sed 's/^**Project Type**: //' || echo "")
+# Extract tech from new plan in a single pass, stopping once every field is found
+NEW_LANG=""
+NEW_FRAMEWORK=""
+NEW_TESTING=""
+NEW_DB=""
+NEW_PROJECT_TYPE=""
+SEEN_FIELDS=" "
+REMAINING_FIELDS=5
+while IFS= read -r line || [ -n "$line" ]; do
+    case "$line" in
+        "**Language/Version**: "*) field=NEW_LANG ;;
+        "**Primary Dependencies**: "*) field=NEW_FRAMEWORK ;;
+        "**Testing**: "*) field=NEW_TESTING ;;
+        "**Storage**: "*) field=NEW_DB ;;
+        "**Project Type**: "*) field=NEW_PROJECT_TYPE ;;
+        *) continue ;;
+    esac
+    # Only the first occurrence of each field counts
+    case "$SEEN_FIELDS" in
+        *" $field "*) continue ;;
+    esac
+    SEEN_FIELDS="$SEEN_FIELDS$field "
+    value="${line#*\*\*: }"
+    # Drop trailing whitespace (markdown line breaks in the template)
+    value="${value%"${value##*[![:space:]]}"}"
+    case "$field:$value" in
+        NEW_PROJECT_TYPE:*) ;;
+        NEW_DB:*N/A*|*"NEEDS CLARIFICATION"*) value="" ;;
+    esac
+    printf -v "$field" '%s' "$value"
+    REMAINING_FIELDS=$((REMAINING_FIELDS - 1))
+    if [ "$REMAINING_FIELDS" -eq 0 ]; then
+        break
+    fi
+done < "$NEW_PLAN"
+
+# Default test/lint commands for the plan's language, shared by both update paths
+commands_for_lang() {
+    case "$1" in
+        *Python*) echo "cd src && pytest && ruff check ." ;;
+        *Rust*) echo "cargo test && cargo clippy" ;;
+        *JavaScript*|*TypeScript*) echo "npm test && npm run lint" ;;
+    esac
+}
+LANG_COMMANDS=$(commands_for_lang "$NEW_LANG")
+
+# Escape a value for use as a sed replacement delimited by |
+sed_escape() {
+    local value="${1//\\/\\\\}"
+    value="${value//&/\\&}"
+    printf '%s' "${value//|/\\|}"
+}
+
+# Temp file of the update in progress; removed if the script exits early
+TEMP_FILE=""
+trap 'rm -f "$TEMP_FILE"' EXIT
 
 # Function to update a single agent context file
 update_agent_file() {
@@ -39,52 +117,48 @@ update_agent_file() {
     
     echo "Updating $agent_name context file: $target_file"
     
-    # Create temp file for new context
-    local temp_file=$(mktemp)
-    
-    # If file doesn't exist, create from template
-    if [ ! -f "$target_file" ]; then
-        echo "Creating new $agent_name context file..."
-        
-        # Check if this is the SDD repo itself
-        if [ -f "$REPO_ROOT/templates/agent-file-template.md" ]; then
-            cp "$REPO_ROOT/templates/agent-file-template.md" "$temp_file"
-        else
-            echo "ERROR: Template not found at $REPO_ROOT/templates/agent-file-template.md"
+    # If file doesn't exist or is empty, create from template; an empty file has
+    # no sections to update, so there is nothing worth parsing
+    local template="$REPO_ROOT/templates/agent-file-template.md"
+    local create_new=false
+    if [ ! -s "$target_file" ]; then
+        create_new=true
+        # Check the template before creating anything next to the target
+        if [ ! -f "$template" ]; then
+            echo "ERROR: Template not found at $template"
             return 1
         fi
-        
-        # Replace placeholders
-        sed -i.bak "s/\[PROJECT NAME\]/$(basename $REPO_ROOT)/" "$temp_file"
-        sed -i.bak "s/\[DATE\]/$(date +%Y-%m-%d)/" "$temp_file"
-        sed -i.bak "s/\[EXTRACTED FROM ALL PLAN.MD FILES\]/- $NEW_LANG + $NEW_FRAMEWORK ($CURRENT_BRANCH)/" "$temp_file"
+    fi
+    
+    # Create temp file for new context next to the target so the final mv
+    # is an atomic rename rather than a cross-filesystem copy
+    mkdir -p "${target_file%/*}"
+    TEMP_FILE=$(mktemp "$target_file.XXXXXX")
+    local temp_file="$TEMP_FILE"
+    
+    if $create_new; then
+        echo "Creating new $agent_name context file..."
         
         # Add project structure based on type
+        local structure
         if [[ "$NEW_PROJECT_TYPE" == *"web"* ]]; then
-            sed -i.bak "s|\[ACTUAL STRUCTURE FROM PLANS\]|backend/\nfrontend/\ntests/|" "$temp_file"
+            structure="backend/\nfrontend/\ntests/"
         else
-            sed -i.bak "s|\[ACTUAL STRUCTURE FROM PLANS\]|src/\ntests/|" "$temp_file"
+            structure="src/\ntests/"
         fi
         
         # Add minimal commands
-        if [[ "$NEW_LANG" == *"Python"* ]]; then
-            COMMANDS="cd src && pytest && ruff check ."
-        elif [[ "$NEW_LANG" == *"Rust"* ]]; then
-            COMMANDS="cargo test && cargo clippy"
-        elif [[ "$NEW_LANG" == *"JavaScript"* ]] || [[ "$NEW_LANG" == *"TypeScript"* ]]; then
-            COMMANDS="npm test && npm run lint"
-        else
-            COMMANDS="# Add commands for $NEW_LANG"
-        fi
-        sed -i.bak "s|\[ONLY COMMANDS FOR ACTIVE TECHNOLOGIES\]|$COMMANDS|" "$temp_file"
-        
-        # Add code style
-        sed -i.bak "s|\[LANGUAGE-SPECIFIC, ONLY FOR LANGUAGES IN USE\]|$NEW_LANG: Follow standard conventions|" "$temp_file"
-        
-        # Add recent changes
-        sed -i.bak "s|\[LAST 3 FEATURES AND WHAT THEY ADDED\]|- $CURRENT_BRANCH: Added $NEW_LANG + $NEW_FRAMEWORK|" "$temp_file"
+        local commands="${LANG_COMMANDS:-# Add commands for $NEW_LANG}"
         
-        rm "$temp_file.bak"
+        # Replace every placeholder in a single streaming pass over the template
+        sed -e "s|\[PROJECT NAME\]|$(sed_escape "$(basename "$REPO_ROOT")")|" \
+            -e "s|\[DATE\]|$(date +%Y-%m-%d)|" \
+            -e "s|\[EXTRACTED FROM ALL PLAN.MD FILES\]|$(sed_escape "- $NEW_LANG + $NEW_FRAMEWORK ($CURRENT_BRANCH)")|" \
+            -e "s|\[ACTUAL STRUCTURE FROM PLANS\]|$structure|" \
+            -e "s|\[ONLY COMMANDS FOR ACTIVE TECHNOLOGIES\]|$(sed_escape "$commands")|" \
+            -e "s|\[LANGUAGE-SPECIFIC, ONLY FOR LANGUAGES IN USE\]|$(sed_escape "$NEW_LANG: Follow standard conventions")|" \
+            -e "s|\[LAST 3 FEATURES AND WHAT THEY ADDED\]|$(sed_escape "- $CURRENT_BRANCH: Added $NEW_LANG + $NEW_FRAMEWORK")|" \
+            "$template" > "$temp_file"
     else
         echo "Updating existing $agent_name context file..."
         
@@ -97,77 +171,105 @@ update_agent_file() {
         fi
         
         # Parse existing file and create updated version
-        python3 - << EOF
+        NEW_LANG="$NEW_LANG" NEW_FRAMEWORK="$NEW_FRAMEWORK" NEW_DB="$NEW_DB" \
+        NEW_PROJECT_TYPE="$NEW_PROJECT_TYPE" LANG_COMMANDS="$LANG_COMMANDS" \
+        CURRENT_BRANCH="$CURRENT_BRANCH" \
+        python3 - "$target_file" "$temp_file" << 'EOF'
+import os
 import re
 import sys
-from datetime import datetime
+from collections import deque
+
+DATE_RE = re.compile(r'Last updated: \d{4}-\d{2}-\d{2}')
+
+
+def find_section(content, header, end_marker='\n\n', to_eof=False):
+    """Return the (start, end) span of the body below header, or None."""
+    start = content.find(header + '\n')
+    if start == -1:
+        return None
+    start += len(header) + 1
+    end = content.find(end_marker, start)
+    if end == -1:
+        if not to_eof:
+            return None
+        end = len(content) - content.endswith('\n')
+    return start, end
+
+
+def replace_section(content, span, body):
+    """Splice body into content in place of the given section span."""
+    return content[:span[0]] + body + content[span[1]:]
+
+
+target_file, temp_file = sys.argv[1], sys.argv[2]
+NEW_LANG = os.environ["NEW_LANG"]
+NEW_FRAMEWORK = os.environ["NEW_FRAMEWORK"]
+NEW_DB = os.environ["NEW_DB"]
+NEW_PROJECT_TYPE = os.environ["NEW_PROJECT_TYPE"]
+LANG_COMMANDS = os.environ["LANG_COMMANDS"]
+CURRENT_BRANCH = os.environ["CURRENT_BRANCH"]
 
 # Read existing file
-with open("$target_file", 'r') as f:
+with open(target_file, 'r') as f:
     content = f.read()
+original_content = content
 
 # Check if new tech already exists
-tech_section = re.search(r'## Active Technologies\n(.*?)\n\n', content, re.DOTALL)
-if tech_section:
-    existing_tech = tech_section.group(1)
+tech_span = find_section(content, '## Active Technologies')
+if tech_span:
+    existing_tech = content[tech_span[0]:tech_span[1]]
     
     # Add new tech if not already present
     new_additions = []
-    if "$NEW_LANG" and "$NEW_LANG" not in existing_tech:
-        new_additions.append(f"- $NEW_LANG + $NEW_FRAMEWORK ($CURRENT_BRANCH)")
-    if "$NEW_DB" and "$NEW_DB" not in existing_tech and "$NEW_DB" != "N/A":
-        new_additions.append(f"- $NEW_DB ($CURRENT_BRANCH)")
+    if NEW_LANG and NEW_LANG not in existing_tech:
+        new_additions.append(f"- {NEW_LANG} + {NEW_FRAMEWORK} ({CURRENT_BRANCH})")
+    if NEW_DB and NEW_DB not in existing_tech and NEW_DB != "N/A":
+        new_additions.append(f"- {NEW_DB} ({CURRENT_BRANCH})")
     
     if new_additions:
         updated_tech = existing_tech + "\n" + "\n".join(new_additions)
-        content = content.replace(tech_section.group(0), f"## Active Technologies\n{updated_tech}\n\n")
+        content = replace_section(content, tech_span, updated_tech)
 
 # Update project structure if needed
-if "$NEW_PROJECT_TYPE" == "web" and "frontend/" not in content:
-    struct_section = re.search(r'## Project Structure\n\`\`\`\n(.*?)\n\`\`\`', content, re.DOTALL)
-    if struct_section:
-        updated_struct = struct_section.group(1) + "\nfrontend/src/      # Web UI"
-        content = re.sub(r'(## Project Structure\n\`\`\`\n).*?(\n\`\`\`)', 
-                        f'\\1{updated_struct}\\2', content, flags=re.DOTALL)
+if NEW_PROJECT_TYPE == "web" and "frontend/" not in content:
+    struct_span = find_section(content, '## Project Structure\n```', '\n```')
+    if struct_span:
+        updated_struct = content[struct_span[0]:struct_span[1]] + "\nfrontend/src/      # Web UI"
+        content = replace_section(content, struct_span, updated_struct)
 
 # Add new commands if language is new
-if "$NEW_LANG" and f"# {NEW_LANG}" not in content:
-    commands_section = re.search(r'## Commands\n\`\`\`bash\n(.*?)\n\`\`\`', content, re.DOTALL)
-    if not commands_section:
-        commands_section = re.search(r'## Commands\n(.*?)\n\n', content, re.DOTALL)
+if NEW_LANG and f"# {NEW_LANG}" not in content:
+    commands_span = find_section(content, '## Commands\n```bash', '\n```')
+    if not commands_span:
+        commands_span = find_section(content, '## Commands')
     
-    if commands_section:
-        new_commands = commands_section.group(1)
-        if "Python" in "$NEW_LANG":
-            new_commands += "\ncd src && pytest && ruff check ."
-        elif "Rust" in "$NEW_LANG":
-            new_commands += "\ncargo test && cargo clippy"
-        elif "JavaScript" in "$NEW_LANG" or "TypeScript" in "$NEW_LANG":
-            new_commands += "\nnpm test && npm run lint"
-        
-        if "```bash" in content:
-            content = re.sub(r'(## Commands\n\`\`\`bash\n).*?(\n\`\`\`)', 
-                            f'\\1{new_commands}\\2', content, flags=re.DOTALL)
-        else:
-            content = re.sub(r'(## Commands\n).*?(\n\n)', 
-                            f'\\1{new_commands}\\2', content, flags=re.DOTALL)
+    if commands_span:
+        new_commands = content[commands_span[0]:commands_span[1]]
+        if LANG_COMMANDS and LANG_COMMANDS not in new_commands:
+            new_commands += "\n" + LANG_COMMANDS
+            content = replace_section(content, commands_span, new_commands)
 
 # Update recent changes (keep only last 3)
-changes_section = re.search(r'## Recent Changes\n(.*?)(\n\n|$)', content, re.DOTALL)
-if changes_section:
-    changes = changes_section.group(1).strip().split('\n')
-    changes.insert(0, f"- $CURRENT_BRANCH: Added $NEW_LANG + $NEW_FRAMEWORK")
-    # Keep only last 3
-    changes = changes[:3]
-    content = re.sub(r'(## Recent Changes\n).*?(\n\n|$)', 
-                    f'\\1{chr(10).join(changes)}\\2', content, flags=re.DOTALL)
-
-# Update date
-content = re.sub(r'Last updated: \d{4}-\d{2}-\d{2}', 
-                f'Last updated: {datetime.now().strftime("%Y-%m-%d")}', content)
+changes_span = find_section(content, '## Recent Changes', to_eof=True)
+if changes_span:
+    existing = [line for line in content[changes_span[0]:changes_span[1]].split('\n') if line.strip()]
+    new_change = f"- {CURRENT_BRANCH}: Added {NEW_LANG} + {NEW_FRAMEWORK}"
+    # Re-running for the same plan must not stack duplicate entries
+    if not existing or existing[0].rstrip() != new_change.rstrip():
+        # Keep only last 3: entries are held oldest first, so the bounded
+        # deque drops the oldest one when the new entry is appended
+        changes = deque(reversed(existing), maxlen=3)
+        changes.append(new_change)
+        content = replace_section(content, changes_span, '\n'.join(reversed(changes)))
+
+# Update date only when a section changed, so re-runs leave the file as is
+if content != original_content:
+    from datetime import datetime
+    content = DATE_RE.sub(f'Last updated: {datetime.now().strftime("%Y-%m-%d")}', content)
 
 # Write to temp file
-with open("$temp_file", 'w') as f:
+with open(temp_file, 'w') as f:
     f.write(content)
 EOF
 
@@ -181,7 +283,12 @@ EOF
         fi
     fi
     
-    # Move temp file to final location
+    # Move temp file to final location, skipping the write if nothing changed
+    if [ -f "$target_file" ] && cmp -s "$temp_file" "$target_file"; then
+        rm "$temp_file"
+        echo "✅ $agent_name context file already up to date"
+        return 0
+    fi
     mv "$temp_file" "$target_file"
     echo "✅ $agent_name context file updated successfully"
 }
@@ -199,36 +306,36 @@ case "$AGENT_TYPE" in
         ;;
     "")
         # Update all existing files
-        [ -f "$CLAUDE_FILE" ] && update_agent_file "$CLAUDE_FILE" "Claude Code"
-        [ -f "$GEMINI_FILE" ] && update_agent_file "$GEMINI_FILE" "Gemini CLI" 
-        [ -f "$COPILOT_FILE" ] && update_agent_file "$COPILOT_FILE" "GitHub Copilot"
+        FOUND_ANY=false
+        if [ -f "$CLAUDE_FILE" ]; then
+            update_agent_file "$CLAUDE_FILE" "Claude Code"; FOUND_ANY=true
+        fi
+        if [ -f "$GEMINI_FILE" ]; then
+            update_agent_file "$GEMINI_FILE" "Gemini CLI"; FOUND_ANY=true
+        fi
+        if [ -f "$COPILOT_FILE" ]; then
+            update_agent_file "$COPILOT_FILE" "GitHub Copilot"; FOUND_ANY=true
+        fi
         
         # If no files exist, create based on current directory or ask user
-        if [ ! -f "$CLAUDE_FILE" ] && [ ! -f "$GEMINI_FILE" ] && [ ! -f "$COPILOT_FILE" ]; then
+        if ! $FOUND_ANY; then
             echo "No agent context files found. Creating Claude Code context file by default."
             update_agent_file "$CLAUDE_FILE" "Claude Code"
         fi
         ;;
-    *)
-        echo "ERROR: Unknown agent type '$AGENT_TYPE'. Use: claude, gemini, copilot, or leave empty for all."
-        exit 1
-        ;;
 esac
-echo ""
-echo "Summary of changes:"
+
+# Collect the summary and print it
+SUMMARY=("" "Summary of changes:")
 if [ ! -z "$NEW_LANG" ]; then
-    echo "- Added language: $NEW_LANG"
+    SUMMARY+=("- Added language: $NEW_LANG")
 fi
 if [ ! -z "$NEW_FRAMEWORK" ]; then
-    echo "- Added framework: $NEW_FRAMEWORK"
+    SUMMARY+=("- Added framework: $NEW_FRAMEWORK")
 fi
 if [ ! -z "$NEW_DB" ] && [ "$NEW_DB" != "N/A" ]; then
-    echo "- Added database: $NEW_DB"
+    SUMMARY+=("- Added database: $NEW_DB")
 fi
+printf '%s\n' "${SUMMARY[@]}"
 
-echo ""
-echo "Usage: $0 [claude|gemini|copilot]"
-echo "  - No argument: Update all existing agent context files"
-echo "  - claude: Update only CLAUDE.md"
-echo "  - gemini: Update only GEMINI.md" 
-echo "  - copilot: Update only .github/copilot-instructions.md"
\ No newline at end of file
+printf '\n%s\n' "$USAGE"
\ No newline at end of file
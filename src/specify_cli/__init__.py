@@ -28,12 +28,10 @@ import sys
 import zipfile
 import tempfile
 import shutil
-import json
 from pathlib import Path
 from typing import Optional
 
 import typer
-import httpx
 from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
@@ -54,6 +52,21 @@ AI_CHOICES = {
     "gemini": "Gemini CLI"
 }
 
+# CLI tool each AI assistant needs: (tool, install hint, error message)
+# GitHub Copilot is not listed as it's typically available in supported IDEs
+AGENT_TOOLS = {
+    "claude": (
+        "claude",
+        "Install from: https://docs.anthropic.com/en/docs/claude-code/setup",
+        "Claude CLI is required for Claude Code projects",
+    ),
+    "gemini": (
+        "gemini",
+        "Install from: https://github.com/google-gemini/gemini-cli",
+        "Gemini CLI is required for Gemini projects",
+    ),
+}
+
 # ASCII Art Banner
 BANNER = """
 ███████╗██████╗ ███████╗ ██████╗██╗███████╗██╗   ██╗
@@ -65,6 +78,20 @@ BANNER = """
 """
 
 TAGLINE = "Spec-Driven Development Toolkit"
+
+# Flags that request help; checked against argv in a single pass
+HELP_FLAGS = frozenset({"--help", "-h"})
+
+# Rich markup for each step status, shared by every render
+STEP_SYMBOLS = {
+    "done": "[green]●[/green]",
+    "pending": "[green dim]○[/green dim]",
+    "running": "[cyan]○[/cyan]",
+    "error": "[red]●[/red]",
+    "skipped": "[yellow]○[/yellow]",
+}
+
+
 class StepTracker:
     """Track and render hierarchical steps without emojis, similar to Claude Code tree output.
     Supports live auto-refresh via an attached refresh callback.
@@ -72,6 +99,7 @@ class StepTracker:
     def __init__(self, title: str):
         self.title = title
         self.steps = []  # list of dicts: {key, label, status, detail}
+        self._index = {}  # key -> step dict, for O(1) lookups
         self.status_order = {"pending": 0, "running": 1, "done": 2, "error": 3, "skipped": 4}
         self._refresh_cb = None  # callable to trigger UI refresh
 
@@ -79,8 +107,8 @@ class StepTracker:
         self._refresh_cb = cb
 
     def add(self, key: str, label: str):
-        if key not in [s["key"] for s in self.steps]:
-            self.steps.append({"key": key, "label": label, "status": "pending", "detail": ""})
+        if key not in self._index:
+            self._append(key, label, "pending", "")
             self._maybe_refresh()
 
     def start(self, key: str, detail: str = ""):
@@ -96,17 +124,22 @@ class StepTracker:
         self._update(key, status="skipped", detail=detail)
 
     def _update(self, key: str, status: str, detail: str):
-        for s in self.steps:
-            if s["key"] == key:
-                s["status"] = status
-                if detail:
-                    s["detail"] = detail
-                self._maybe_refresh()
-                return
+        s = self._index.get(key)
+        if s is not None:
+            s["status"] = status
+            if detail:
+                s["detail"] = detail
+            self._maybe_refresh()
+            return
         # If not present, add it
-        self.steps.append({"key": key, "label": key, "status": status, "detail": detail})
+        self._append(key, key, status, detail)
         self._maybe_refresh()
 
+    def _append(self, key: str, label: str, status: str, detail: str):
+        step = {"key": key, "label": label, "status": status, "detail": detail}
+        self.steps.append(step)
+        self._index[key] = step
+
     def _maybe_refresh(self):
         if self._refresh_cb:
             try:
@@ -122,18 +155,7 @@ class StepTracker:
 
             # Circles (unchanged styling)
             status = step["status"]
-            if status == "done":
-                symbol = "[green]●[/green]"
-            elif status == "pending":
-                symbol = "[green dim]○[/green dim]"
-            elif status == "running":
-                symbol = "[cyan]○[/cyan]"
-            elif status == "error":
-                symbol = "[red]●[/red]"
-            elif status == "skipped":
-                symbol = "[yellow]○[/yellow]"
-            else:
-                symbol = " "
+            symbol = STEP_SYMBOLS.get(status, " ")
 
             if status == "pending":
                 # Entire line light gray (pending)
@@ -305,7 +327,7 @@ def callback(ctx: typer.Context):
     """Show banner when no subcommand is provided."""
     # Show banner only when no subcommand and no help flag
     # (help is handled by BannerGroup)
-    if ctx.invoked_subcommand is None and "--help" not in sys.argv and "-h" not in sys.argv:
+    if ctx.invoked_subcommand is None and HELP_FLAGS.isdisjoint(sys.argv[1:]):
         show_banner()
         console.print(Align.center("[dim]Run 'specify --help' for usage information[/dim]"))
         console.print()
@@ -389,6 +411,9 @@ def download_template_from_github(ai_assistant: str, download_dir: Path, *, verb
     """Download the latest template release from GitHub using HTTP requests.
     Returns (zip_path, metadata_dict)
     """
+    # Only needed for network access; imported here to keep CLI startup light
+    import httpx
+
     repo_owner = "github"
     repo_name = "spec-kit"
     
@@ -415,9 +440,11 @@ def download_template_from_github(ai_assistant: str, download_dir: Path, *, verb
     if not matching_assets:
         if verbose:
             console.print(f"[red]Error:[/red] No template found for AI assistant '{ai_assistant}'")
-            console.print(f"[yellow]Available assets:[/yellow]")
-            for asset in release_data.get("assets", []):
-                console.print(f"  - {asset['name']}")
+            # Print the listing in one call rather than once per asset
+            console.print("\n".join(
+                ["[yellow]Available assets:[/yellow]"]
+                + [f"  - {asset['name']}" for asset in release_data.get("assets", [])]
+            ))
         raise typer.Exit(1)
     
     # Use the first matching asset
@@ -587,9 +614,10 @@ def download_and_extract_template(project_path: Path, ai_assistant: str, is_curr
                     tracker.start("extracted-summary")
                     tracker.complete("extracted-summary", f"{len(extracted_items)} top-level items")
                 elif verbose:
-                    console.print(f"[cyan]Extracted {len(extracted_items)} items to {project_path}:[/cyan]")
-                    for item in extracted_items:
-                        console.print(f"  - {item.name} ({'dir' if item.is_dir() else 'file'})")
+                    console.print("\n".join(
+                        [f"[cyan]Extracted {len(extracted_items)} items to {project_path}:[/cyan]"]
+                        + [f"  - {item.name} ({'dir' if item.is_dir() else 'file'})" for item in extracted_items]
+                    ))
                 
                 # Handle GitHub-style ZIP with a single root directory
                 if len(extracted_items) == 1 and extracted_items[0].is_dir():
@@ -727,19 +755,10 @@ def init(
         )
     
     # Check agent tools unless ignored
-    if not ignore_agent_tools:
-        agent_tool_missing = False
-        if selected_ai == "claude":
-            if not check_tool("claude", "Install from: https://docs.anthropic.com/en/docs/claude-code/setup"):
-                console.print("[red]Error:[/red] Claude CLI is required for Claude Code projects")
-                agent_tool_missing = True
-        elif selected_ai == "gemini":
-            if not check_tool("gemini", "Install from: https://github.com/google-gemini/gemini-cli"):
-                console.print("[red]Error:[/red] Gemini CLI is required for Gemini projects")
-                agent_tool_missing = True
-        # GitHub Copilot check is not needed as it's typically available in supported IDEs
-        
-        if agent_tool_missing:
+    if not ignore_agent_tools and selected_ai in AGENT_TOOLS:
+        tool, install_hint, error_message = AGENT_TOOLS[selected_ai]
+        if not check_tool(tool, install_hint):
+            console.print(f"[red]Error:[/red] {error_message}")
             console.print("\n[red]Required AI tool is missing![/red]")
             console.print("[yellow]Tip:[/yellow] Use --ignore-agent-tools to skip this check")
             raise typer.Exit(1)
@@ -837,6 +856,8 @@ def init(
 @app.command()
 def check():
     """Check that all required tools are installed."""
+    import httpx
+
     show_banner()
     console.print("[bold]Checking Specify requirements...[/bold]\n")
     
@@ -853,8 +874,10 @@ def check():
     git_ok = check_tool("git", "https://git-scm.com/downloads")
     
     console.print("\n[cyan]Optional AI tools:[/cyan]")
-    claude_ok = check_tool("claude", "Install from: https://docs.anthropic.com/en/docs/claude-code/setup")
-    gemini_ok = check_tool("gemini", "Install from: https://github.com/google-gemini/gemini-cli")
+    claude_tool, claude_hint, _ = AGENT_TOOLS["claude"]
+    claude_ok = check_tool(claude_tool, claude_hint)
+    gemini_tool, gemini_hint, _ = AGENT_TOOLS["gemini"]
+    gemini_ok = check_tool(gemini_tool, gemini_hint)
     
     console.print("\n[green]✓ Specify CLI is ready to use![/green]")
     if not git_ok: